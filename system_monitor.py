@@ -9,16 +9,377 @@ Features include:
 - Performance tracking
 """
 
-import psutil
+# psutil, csv, json and argparse are imported where they are used, so commands that
+# never touch them (e.g. workflow monitoring) start without loading them
+import sys
 import time
-import json
-import argparse
-import csv
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional, Tuple
 import os
 import re
+import heapq
+from collections import Counter, deque
+
+
+# Common error patterns searched for by SystemMonitor.analyze_logs
+_DEFAULT_ERROR_PATTERNS = ['error', 'exception', 'fail', 'traceback', 'critical', 'fatal']
+
+# Single alternation so each line is scanned once; the group name identifies the pattern
+_COMPILED_UNION = re.compile(
+    '|'.join(f'(?P<{p}>{p})' for p in _DEFAULT_ERROR_PATTERNS),
+    re.IGNORECASE
+)
+
+# Lowercased literals of the default patterns, used to locate candidate lines before running regex
+_ERROR_LITERALS = tuple(p.encode() for p in _DEFAULT_ERROR_PATTERNS)
+
+# Non-ASCII characters that case-insensitive str regexes treat as equal to an ASCII
+# letter (dotted/dotless I, Kelvin sign, long s); these are the only ones in Unicode
+_NON_ASCII_CASE_FOLDS = {
+    ord('i'): ('\u0130', '\u0131'),
+    ord('k'): ('\u212a',),
+    ord('s'): ('\u017f',)
+}
+
+
+def _literal_bytes_pattern(literal: bytes) -> bytes:
+    """
+    Build a case-insensitive byte pattern matching a lowercased ASCII literal in UTF-8 text.
+    
+    The byte pattern must accept every line the str regex would, so letters that
+    have non-ASCII case-insensitive equivalents also match their UTF-8 encodings.
+    
+    Args:
+        literal: Lowercased ASCII literal
+        
+    Returns:
+        Regex source for use with re.IGNORECASE on bytes
+    """
+    parts = []
+    for byte in literal:
+        part = re.escape(bytes([byte]))
+        if byte in _NON_ASCII_CASE_FOLDS:
+            alternatives = [part] + [c.encode() for c in _NON_ASCII_CASE_FOLDS[byte]]
+            part = b'(?:' + b'|'.join(alternatives) + b')'
+        parts.append(part)
+    return b''.join(parts)
+
+
+# Byte-level scanner over whole read buffers; hits are then expanded to their full line
+_ERROR_BYTES_RE = re.compile(
+    b'|'.join(_literal_bytes_pattern(lit) for lit in _ERROR_LITERALS),
+    re.IGNORECASE
+)
+
+# Size of each bulk read when scanning log files
+_LOG_CHUNK_SIZE = 1 << 23
+
+# Snapshots kept in memory by default while monitor_system streams to an output file
+STREAMED_HISTORY = 100
+
+# Cached project entries modified this close to (or after) the previous walk are
+# re-read: filesystem timestamps are coarse, so a change made in the same tick as
+# that walk can leave the mtime unchanged
+_RACY_MARGIN_NS = 2 * 10**9
+
+# Process attributes fetched in a single pass by psutil.process_iter
+_PROCESS_ATTRS = ['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'memory_info', 'create_time']
+
+# Flattened column layout used for CSV output of system snapshots
+CSV_FIELDS = (
+    'timestamp', 'cpu_percent', 'cpu_count',
+    'memory_total', 'memory_available', 'memory_percent', 'memory_used',
+    'disk_total', 'disk_used', 'disk_free', 'disk_percent',
+    'network_bytes_sent', 'network_bytes_recv'
+)
+
+# Extensions always line-counted in project stats, without sniffing for binary content
+TEXT_EXTS = {
+    '.py', '.js', '.ts', '.md', '.txt', '.c', '.cc', '.cpp', '.h', '.rs', '.go', '.java',
+    '.rb', '.json', '.yaml', '.yml', '.toml', '.html', '.css', '.sh'
+}
+
+# Extensions never line-counted in project stats
+BINARY_EXTS = {
+    '.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.gz', '.tar', '.pack', '.so', '.dll',
+    '.exe', '.bin', '.ico', '.woff', '.woff2', '.mp4'
+}
+
+# Leading bytes inspected for a NUL when deciding whether an unknown file is binary
+_BINARY_SNIFF_SIZE = 4096
+
+_REGEX_METACHARS = set('.^$*+?{}[]()|\\')
+
+
+def _escape_length(pattern: str, i: int) -> int:
+    """
+    Measure the length of the regex escape sequence starting at a backslash.
+    
+    Args:
+        pattern: Regular expression pattern
+        i: Index of the backslash in the pattern
+        
+    Returns:
+        Number of characters the escape spans, including the backslash
+    """
+    char = pattern[i + 1:i + 2]
+    if char == 'x':
+        return 4
+    if char == 'u':
+        return 6
+    if char == 'U':
+        return 10
+    if char == 'N':
+        close = pattern.find('}', i)
+        return close - i + 1 if close != -1 else 2
+    if char.isdigit():
+        # Octal escapes and backreferences; over-skipping only shortens the literal
+        end = i + 1
+        while end < len(pattern) and end - i <= 3 and pattern[end].isdigit():
+            end += 1
+        return end - i
+    return 2
+
+
+def _required_literal(pattern: str) -> Optional[bytes]:
+    """
+    Extract a literal substring that every match of a regex pattern must contain.
+    
+    Args:
+        pattern: Regular expression pattern
+        
+    Returns:
+        Longest required literal as lowercased bytes, or None if none can be found
+    """
+    if '|' in pattern or not pattern.isascii() or re.search(r'\(\?[a-zA-Z]*x', pattern):
+        return None
+    
+    runs = []
+    current = ''
+    depth = 0
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char not in _REGEX_METACHARS:
+            if depth == 0:
+                current += char
+            i += 1
+            continue
+        
+        # A quantifier that allows zero repetitions makes the preceding char optional
+        if char in '?*{':
+            current = current[:-1]
+        runs.append(current)
+        current = ''
+        
+        if char == '\\':
+            i += _escape_length(pattern, i)
+        elif char == '[':
+            # Skip the whole character class, honouring a leading ']' and escapes
+            i += 1
+            if i < len(pattern) and pattern[i] == '^':
+                i += 1
+            if i < len(pattern) and pattern[i] == ']':
+                i += 1
+            while i < len(pattern) and pattern[i] != ']':
+                i += 2 if pattern[i] == '\\' else 1
+            i += 1
+        elif char == '{':
+            close = pattern.find('}', i)
+            i = close + 1 if close != -1 else i + 1
+        else:
+            if char == '(':
+                depth += 1
+            elif char == ')' and depth:
+                depth -= 1
+            i += 1
+    runs.append(current)
+    
+    literal = max(runs, key=len)
+    return literal.lower().encode() if literal else None
+
+
+def _iter_line_blocks(f):
+    """
+    Read a binary file in large chunks and yield them split on line boundaries.
+    
+    Args:
+        f: File object opened in binary mode
+        
+    Yields:
+        Buffers of one or more complete lines, without the final newline
+    """
+    # Pieces of the trailing partial line, joined only once a newline completes it so
+    # a line spanning many reads is copied once rather than on every read
+    pending = []
+    while True:
+        chunk = f.read(_LOG_CHUNK_SIZE)
+        if not chunk:
+            break
+        
+        cut = chunk.rfind(b'\n')
+        if cut == -1:
+            pending.append(chunk)
+            continue
+        
+        pending.append(chunk[:cut])
+        yield b''.join(pending)
+        # Hold back the trailing partial line until a later read completes it
+        pending = [chunk[cut + 1:]]
+    
+    carry = b''.join(pending)
+    if carry:
+        yield carry
+
+
+def _iter_candidate_lines(block: bytes, candidate_re: Optional[re.Pattern]):
+    """
+    Yield lines of a buffer that may contain a match.
+    
+    Args:
+        block: Buffer of complete lines, without the final newline
+        candidate_re: Byte pattern locating candidate lines, or None to yield every line
+        
+    Yields:
+        Tuples of (zero-based line index within the block, line bytes)
+    """
+    if candidate_re is None:
+        yield from enumerate(block.split(b'\n'))
+        return
+    
+    line_index = 0
+    counted = 0
+    pos = 0
+    while True:
+        match = candidate_re.search(block, pos)
+        if not match:
+            return
+        
+        start = block.rfind(b'\n', 0, match.start()) + 1
+        end = block.find(b'\n', match.end())
+        if end == -1:
+            end = len(block)
+        
+        # Newlines are only counted between hits, so untouched lines cost no Python work
+        line_index += block.count(b'\n', counted, start)
+        counted = start
+        yield line_index, block[start:end]
+        pos = end + 1
+
+
+# Resolved on first use by _to_json
+_json_encoder = None
+
+
+def _to_json(data: Any, indent: bool = False) -> bytes:
+    """
+    Serialize data to JSON bytes, using orjson when it is installed.
+    
+    Args:
+        data: JSON-serializable data
+        indent: Pretty-print with a two-space indent
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    global _json_encoder
+    if _json_encoder is None:
+        try:
+            import orjson
+            _json_encoder = lambda obj, pretty: orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except ImportError:
+            import json
+            # Match orjson's output byte for byte: compact separators and raw UTF-8
+            _json_encoder = lambda obj, pretty: json.dumps(
+                obj, indent=2 if pretty else None, separators=None if pretty else (',', ':'), ensure_ascii=False
+            ).encode()
+    return _json_encoder(data, indent)
+
+
+def _nest_snapshot(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Group a flat snapshot's memory, disk and network fields into nested dictionaries.
+    
+    Only used for JSON output, which keeps the nested layout.
+    
+    Args:
+        row: Snapshot as returned by SystemMonitor.get_system_info
+        
+    Returns:
+        Dictionary with "memory", "disk" and "network" sub-dictionaries
+    """
+    nested = {}
+    for key, value in row.items():
+        group, _, field = key.partition('_')
+        if group in ('memory', 'disk', 'network'):
+            nested.setdefault(group, {})[field] = value
+        else:
+            nested[key] = value
+    return nested
+
+
+def _format_timestamp(timestamp: Optional[float]) -> Optional[str]:
+    """
+    Format a POSIX timestamp as an ISO 8601 local time string.
+    
+    Args:
+        timestamp: Seconds since the epoch, or None if unavailable
+        
+    Returns:
+        ISO 8601 string, or None if no timestamp was given
+    """
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+
+class SnapshotWriter:
+    """
+    Write system snapshots to a CSV or JSON file as they are collected.
+    """
+    
+    # Supported output file extensions
+    FORMATS = ('.csv', '.json')
+    
+    def __init__(self, filename: str):
+        self.filepath = Path(filename)
+        self.format = self.filepath.suffix.lower()
+        if self.format not in self.FORMATS:
+            raise ValueError("Output file must have a .csv or .json extension")
+        
+        self.count = 0
+        if self.format == '.csv':
+            import csv
+            self._file = open(self.filepath, 'w', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=CSV_FIELDS, extrasaction='ignore')
+            self._writer.writeheader()
+        else:
+            self._file = open(self.filepath, 'wb')
+            self._file.write(b'[\n')
+    
+    def write(self, snapshot: Dict[str, Any]) -> None:
+        """
+        Append a snapshot to the output file.
+        
+        Args:
+            snapshot: Flat snapshot as returned by SystemMonitor.get_system_info
+        """
+        if self.format == '.csv':
+            self._writer.writerow(snapshot)
+        else:
+            if self.count:
+                self._file.write(b',\n')
+            self._file.write(_to_json(_nest_snapshot(snapshot)))
+        self.count += 1
+        # Flush so the file is usable while a long run is still in progress
+        self._file.flush()
+    
+    def close(self) -> None:
+        """
+        Finish the output file and close it.
+        """
+        if self.format == '.json':
+            self._file.write(b'\n]\n' if self.count else b']\n')
+        self._file.close()
 
 
 class SystemMonitor:
@@ -27,93 +388,165 @@ class SystemMonitor:
     """
     
     def __init__(self):
+        import psutil
         self.monitoring_data = []
+        # The logical CPU count does not change while we run
+        self.cpu_count = psutil.cpu_count()
+        # Prime the CPU counters so the first non-blocking cpu_percent() call is meaningful
+        psutil.cpu_percent(interval=None)
     
     def get_system_info(self) -> Dict[str, Any]:
         """
         Get current system information.
         
         Returns:
-            Dictionary containing system information
+            Flat dictionary of system information, keyed like CSV_FIELDS
         """
+        import psutil
+        
+        vm = psutil.virtual_memory()
+        du = psutil.disk_usage('/')
+        net = psutil.net_io_counters()
+        
+        # Snapshots are stored flat, in the same layout as the CSV columns
         return {
             "timestamp": datetime.now().isoformat(),
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "cpu_count": psutil.cpu_count(),
-            "memory": {
-                "total": psutil.virtual_memory().total,
-                "available": psutil.virtual_memory().available,
-                "percent": psutil.virtual_memory().percent,
-                "used": psutil.virtual_memory().used
-            },
-            "disk": {
-                "total": psutil.disk_usage('/').total,
-                "used": psutil.disk_usage('/').used,
-                "free": psutil.disk_usage('/').free,
-                "percent": psutil.disk_usage('/').percent
-            },
-            "network": {
-                "bytes_sent": psutil.net_io_counters().bytes_sent,
-                "bytes_recv": psutil.net_io_counters().bytes_recv
-            }
+            # Utilisation since the previous call; the caller's sampling interval is the window
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "cpu_count": self.cpu_count,
+            "memory_total": vm.total,
+            "memory_available": vm.available,
+            "memory_percent": vm.percent,
+            "memory_used": vm.used,
+            "disk_total": du.total,
+            "disk_used": du.used,
+            "disk_free": du.free,
+            "disk_percent": du.percent,
+            "network_bytes_sent": net.bytes_sent,
+            "network_bytes_recv": net.bytes_recv
         }
     
-    def monitor_system(self, duration: int = 60, interval: int = 5) -> List[Dict[str, Any]]:
+    def monitor_system(self, duration: int = 60, interval: int = 5, output_file: str = None,
+                       history: Optional[int] = None) -> Deque[Dict[str, Any]]:
         """
         Monitor system resources for a specified duration.
         
         Args:
             duration: Duration to monitor in seconds
             interval: Interval between measurements in seconds
+            output_file: Optional .csv or .json file that snapshots are streamed to
+            history: Optional number of most recent snapshots to keep in memory;
+                defaults to STREAMED_HISTORY when streaming to output_file, and to
+                all snapshots otherwise
             
         Returns:
-            List of system information snapshots
+            The system information snapshots kept in memory, oldest first
         """
-        self.monitoring_data = []
-        start_time = time.time()
+        if history is None and output_file:
+            # The file holds the full run, so memory only needs a bounded recent window
+            history = STREAMED_HISTORY
+        self.monitoring_data = deque(maxlen=history)
+        writer = SnapshotWriter(output_file) if output_file else None
         
-        while time.time() - start_time < duration:
-            snapshot = self.get_system_info()
-            self.monitoring_data.append(snapshot)
-            print(f"Recorded system snapshot at {snapshot['timestamp']}")
-            time.sleep(interval)
+        import psutil
+        # cpu_percent() reports usage since its previous call, so prime it here and take
+        # the first snapshot one interval later; otherwise that window is near zero
+        psutil.cpu_percent(interval=None)
+        
+        # Monotonic clock so wall-clock adjustments (NTP, DST) cannot stretch or cut the run
+        start = time.monotonic()
+        deadline = start + duration
+        next_tick = start + min(interval, duration)
+        
+        try:
+            while True:
+                # Sleep until the next absolute tick so collection time does not accumulate as drift
+                time.sleep(max(0, next_tick - time.monotonic()))
+                
+                snapshot = self.get_system_info()
+                self.monitoring_data.append(snapshot)
+                if writer:
+                    writer.write(snapshot)
+                else:
+                    # Per-snapshot progress is only shown when nothing is being written to disk
+                    print(f"Recorded system snapshot at {snapshot['timestamp']}")
+                
+                next_tick += interval
+                now = time.monotonic()
+                if next_tick <= now:
+                    # A slow sample overran one or more ticks; skip them rather than firing back-to-back
+                    next_tick = now + interval
+                if next_tick > deadline or now >= deadline:
+                    break
+        finally:
+            if writer:
+                writer.close()
         
         return self.monitoring_data
     
-    def get_process_info(self, name_pattern: str = None) -> List[Dict[str, Any]]:
+    def _sample_processes(self, name_pattern: str = None, sample_interval: float = 0.2) -> List[Dict[str, Any]]:
         """
-        Get information about running processes.
+        Collect running processes with their CPU usage over one sampling window.
         
         Args:
             name_pattern: Optional pattern to filter processes by name
+            sample_interval: Seconds over which per-process CPU usage is measured
             
         Returns:
-            List of process information
+            List of process information, with create_time left as a raw timestamp
         """
+        import psutil
+        
         processes = []
+        name_re = re.compile(name_pattern, re.IGNORECASE) if name_pattern else None
         
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent', 'create_time']):
+        # All attributes are fetched in one pass per process. Requesting cpu_percent here
+        # also primes psutil's counters, which report 0.0 on the first call for a process
+        procs = [
+            proc for proc in psutil.process_iter(_PROCESS_ATTRS)
+            # Filter by name pattern if provided, before sampling so rejected processes cost nothing
+            if not name_re or name_re.search(proc.info['name'] or '')
+        ]
+        time.sleep(sample_interval)
+        
+        for proc in procs:
+            info = proc.info
             try:
-                pinfo = proc.info
-                
-                # Filter by name pattern if provided
-                if name_pattern and not re.search(name_pattern, pinfo['name'], re.IGNORECASE):
-                    continue
-                
-                processes.append({
-                    "pid": pinfo['pid'],
-                    "name": pinfo['name'],
-                    "username": pinfo['username'],
-                    "cpu_percent": pinfo['cpu_percent'],
-                    "memory_percent": pinfo['memory_percent'],
-                    "create_time": datetime.fromtimestamp(pinfo['create_time']).isoformat()
-                })
+                # The only per-process read after the window: CPU usage since priming
+                cpu_percent = proc.cpu_percent(None)
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
                 # Process may have terminated during iteration
-                pass
+                continue
+            
+            memory_info = info['memory_info']
+            processes.append({
+                "pid": info['pid'],
+                "name": info['name'],
+                "username": info['username'],
+                "cpu_percent": cpu_percent,
+                "memory_percent": info['memory_percent'],
+                "memory_rss": memory_info.rss if memory_info else None,
+                "create_time": info['create_time']
+            })
         
         return processes
     
+    def get_process_info(self, name_pattern: str = None, sample_interval: float = 0.2) -> List[Dict[str, Any]]:
+        """
+        Get information about running processes.
+        
+        Args:
+            name_pattern: Optional pattern to filter processes by name
+            sample_interval: Seconds over which per-process CPU usage is measured
+            
+        Returns:
+            List of process information
+        """
+        processes = self._sample_processes(name_pattern, sample_interval)
+        for proc in processes:
+            proc["create_time"] = _format_timestamp(proc["create_time"])
+        return processes
+    
     def get_top_processes(self, count: int = 10, resource: str = "cpu") -> List[Dict[str, Any]]:
         """
         Get top processes by CPU or memory usage.
@@ -125,16 +558,16 @@ class SystemMonitor:
         Returns:
             List of top processes
         """
-        processes = self.get_process_info()
-        
-        if resource == "cpu":
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-        elif resource == "memory":
-            processes.sort(key=lambda x: x['memory_percent'], reverse=True)
-        else:
+        if resource not in ("cpu", "memory"):
             raise ValueError("Resource must be 'cpu' or 'memory'")
         
-        return processes[:count]
+        key = f"{resource}_percent"
+        top = heapq.nlargest(count, self._sample_processes(), key=lambda x: x[key] or 0.0)
+        
+        # Only the survivors need a formatted creation time
+        for proc in top:
+            proc["create_time"] = _format_timestamp(proc["create_time"])
+        return top
     
     def save_monitoring_data(self, filename: str) -> None:
         """
@@ -146,37 +579,27 @@ class SystemMonitor:
         filepath = Path(filename)
         
         if filepath.suffix.lower() == '.json':
-            with open(filepath, 'w') as f:
-                json.dump(self.monitoring_data, f, indent=2)
+            with open(filepath, 'wb') as f:
+                f.write(_to_json([_nest_snapshot(row) for row in self.monitoring_data], indent=True))
         elif filepath.suffix.lower() == '.csv':
             if not self.monitoring_data:
                 return
             
+            import csv
             with open(filepath, 'w', newline='') as f:
-                fieldnames = list(self.monitoring_data[0].keys()) + list(self.monitoring_data[0]['memory'].keys()) + list(self.monitoring_data[0]['disk'].keys()) + list(self.monitoring_data[0]['network'].keys())
-                # Remove nested keys and add flattened versions
-                fieldnames = [f for f in fieldnames if f not in ['memory', 'disk', 'network']]
-                fieldnames.extend(['memory_total', 'memory_available', 'memory_percent', 'memory_used'])
-                fieldnames.extend(['disk_total', 'disk_used', 'disk_free', 'disk_percent'])
-                fieldnames.extend(['network_bytes_sent', 'network_bytes_recv'])
-                
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=CSV_FIELDS, extrasaction='ignore')
                 writer.writeheader()
-                
-                for row in self.monitoring_data:
-                    flat_row = {k: v for k, v in row.items() if k not in ['memory', 'disk', 'network']}
-                    flat_row.update({f"memory_{k}": v for k, v in row['memory'].items()})
-                    flat_row.update({f"disk_{k}": v for k, v in row['disk'].items()})
-                    flat_row.update({f"network_{k}": v for k, v in row['network'].items()})
-                    writer.writerow(flat_row)
+                writer.writerows(self.monitoring_data)
     
-    def analyze_logs(self, log_path: str, pattern: str = None) -> Dict[str, Any]:
+    def analyze_logs(self, log_path: str, pattern: str = None, max_errors: int = 1000) -> Dict[str, Any]:
         """
         Analyze log files for specific patterns or errors.
         
         Args:
             log_path: Path to the log file
             pattern: Optional pattern to search for
+            max_errors: Maximum number of matching entries to keep in "errors";
+                counts are still computed over the whole file
             
         Returns:
             Dictionary containing log analysis results
@@ -185,48 +608,94 @@ class SystemMonitor:
         if not log_path.exists():
             return {"error": f"Log file {log_path} does not exist"}
         
-        # Common error patterns
-        error_patterns = [
-            r'error',
-            r'exception',
-            r'fail',
-            r'traceback',
-            r'critical',
-            r'fatal'
-        ]
-        
-        if pattern:
-            error_patterns.append(pattern)
+        user_re = re.compile(pattern, re.IGNORECASE) if pattern else None
         
         results = {
             "file": str(log_path),
             "total_lines": 0,
             "error_lines": 0,
             "errors": [],
-            "error_patterns_found": {}
+            "error_patterns_found": Counter()
         }
+        errors = results["errors"]
+        patterns_found = results["error_patterns_found"]
         
-        with open(log_path, 'r', encoding='utf-8', errors='ignore') as f:
-            for line_num, line in enumerate(f, 1):
-                results["total_lines"] += 1
-                line_lower = line.lower()
+        if not pattern:
+            candidate_re = _ERROR_BYTES_RE
+        else:
+            user_literal = _required_literal(pattern)
+            if user_literal is None:
+                candidate_re = None
+            else:
+                candidate_re = re.compile(
+                    _ERROR_BYTES_RE.pattern + b'|' + _literal_bytes_pattern(user_literal),
+                    re.IGNORECASE
+                )
+        
+        with open(log_path, 'rb') as f:
+            for block in _iter_line_blocks(f):
+                first_line = results["total_lines"] + 1
+                results["total_lines"] += block.count(b'\n') + 1
                 
-                for pattern in error_patterns:
-                    if re.search(pattern, line_lower, re.IGNORECASE):
-                        results["error_lines"] += 1
-                        results["errors"].append({
-                            "line_number": line_num,
-                            "line": line.strip(),
-                            "pattern": pattern
-                        })
+                for line_index, raw_line in _iter_candidate_lines(block, candidate_re):
+                    line_num = first_line + line_index
+                    # Match text-mode reading, where CRLF endings arrive as plain newlines
+                    if raw_line.endswith(b'\r'):
+                        raw_line = raw_line[:-1]
+                    line = raw_line.decode('utf-8', 'ignore')
+                    
+                    # Distinct patterns matched on this line, in first-seen order
+                    found = dict.fromkeys(m.lastgroup for m in _COMPILED_UNION.finditer(line))
+                    if user_re and user_re.search(line):
+                        found[pattern] = None
+                    
+                    if not found:
+                        continue
+                    
+                    results["error_lines"] += 1
+                    stripped = line.strip()
+                    for name in found:
+                        patterns_found[name] += 1
                         
-                        if pattern not in results["error_patterns_found"]:
-                            results["error_patterns_found"][pattern] = 0
-                        results["error_patterns_found"][pattern] += 1
+                        # Keep a bounded sample; huge logs would otherwise hold every hit in memory
+                        if len(errors) < max_errors:
+                            errors.append({
+                                "line_number": line_num,
+                                "line": stripped,
+                                "pattern": name
+                            })
         
         return results
 
 
+def _count_lines(path: str, sniff: bool = False) -> Tuple[int, Optional[int]]:
+    """
+    Measure a file's size and line count in a single pass of chunked binary reads.
+    
+    Args:
+        path: Path to the file
+        sniff: Treat the file as binary if its first bytes contain a NUL
+        
+    Returns:
+        Tuple of (size in bytes, number of lines), where a final line without a
+        trailing newline is counted and lines is None if the file was detected
+        as binary
+    """
+    size = 0
+    lines = 0
+    last = b''
+    with open(path, 'rb', buffering=0) as f:
+        for buf in iter(lambda: f.read(1 << 20), b''):
+            if sniff and not last and b'\0' in buf[:_BINARY_SNIFF_SIZE]:
+                return len(buf), None
+            size += len(buf)
+            lines += buf.count(b'\n')
+            last = buf
+    if last and not last.endswith(b'\n'):
+        lines += 1
+    return size, lines
+
+
 class WorkflowMonitor:
     """
     A class to monitor development workflows.
@@ -235,6 +704,13 @@ class WorkflowMonitor:
     def __init__(self, project_path: str = "."):
         self.project_path = Path(project_path).resolve()
         self.git_enabled = (self.project_path / ".git").exists()
+        # Results of the previous get_project_stats() walk, reused for unchanged entries:
+        # directory path -> (mtime_ns, subdirectory paths, file paths)
+        self._dir_cache = {}
+        # file path -> (size, mtime_ns, line count or None for binary files)
+        self._file_cache = {}
+        # time.time_ns() at the start of the walk that filled the caches
+        self._walk_time_ns = 0
     
     def get_git_status(self) -> Dict[str, Any]:
         """
@@ -248,27 +724,26 @@ class WorkflowMonitor:
         
         try:
             import subprocess
-            # Get current branch
-            branch_result = subprocess.run(
-                ["git", "branch", "--show-current"],
-                cwd=self.project_path,
-                capture_output=True,
-                text=True
-            )
-            current_branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "unknown"
-            
-            # Get status
+            # Branch and working-tree state come from a single status call; the
+            # "# branch.head" header replaces a separate `git branch` process
             status_result = subprocess.run(
-                ["git", "status", "--porcelain"],
+                ["git", "status", "--porcelain=v2", "--branch"],
                 cwd=self.project_path,
                 capture_output=True,
                 text=True
             )
-            has_changes = bool(status_result.stdout.strip())
+            current_branch = "unknown"
+            has_changes = False
+            if status_result.returncode == 0:
+                for line in status_result.stdout.splitlines():
+                    if line.startswith("# branch.head "):
+                        current_branch = line[len("# branch.head "):]
+                    elif not line.startswith("#"):
+                        has_changes = True
             
             # Get last commit
             last_commit_result = subprocess.run(
-                ["git", "log", "-1", "--pretty=format:%h - %an, %ar : %s"],
+                ["git", "--no-pager", "log", "-1", "--pretty=format:%h - %an, %ar : %s"],
                 cwd=self.project_path,
                 capture_output=True,
                 text=True
@@ -283,10 +758,58 @@ class WorkflowMonitor:
         except Exception as e:
             return {"error": f"Error getting Git status: {str(e)}"}
     
+    def _iter_files(self, dir_cache: Dict[str, Any], trusted_before: int):
+        """
+        Recursively yield the files in the project, skipping hidden entries.
+        
+        Hidden directories (such as .git) are pruned rather than walked. A directory
+        whose mtime is unchanged since the previous walk is not listed again; its
+        cached listing is reused, since adding, removing or renaming an entry
+        always updates the directory's mtime.
+        
+        Args:
+            dir_cache: Dictionary that receives the listing of every directory walked
+            trusted_before: Cached listings are only reused for mtimes older than this
+            
+        Yields:
+            Paths of regular files
+        """
+        stack = [str(self.project_path)]
+        while stack:
+            dir_path = stack.pop()
+            try:
+                mtime = os.stat(dir_path).st_mtime_ns
+                cached = self._dir_cache.get(dir_path)
+                if cached and cached[0] == mtime and mtime < trusted_before:
+                    _, subdirs, files = cached
+                else:
+                    subdirs, files = [], []
+                    with os.scandir(dir_path) as entries:
+                        for entry in entries:
+                            if entry.name.startswith('.'):
+                                continue
+                            try:
+                                if entry.is_dir(follow_symlinks=False):
+                                    subdirs.append(entry.path)
+                                elif entry.is_file():
+                                    files.append(entry.path)
+                            except OSError:
+                                continue
+            except OSError:
+                # Directory vanished or is not readable
+                continue
+            
+            dir_cache[dir_path] = (mtime, subdirs, files)
+            stack.extend(subdirs)
+            yield from files
+    
     def get_project_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the project.
         
+        Repeated calls on the same monitor only re-list changed directories and
+        only re-count lines in files whose size or mtime changed.
+        
         Returns:
             Dictionary containing project statistics
         """
@@ -297,39 +820,69 @@ class WorkflowMonitor:
             "largest_files": []
         }
         
+        # Rebuilt on every walk so entries for deleted paths are dropped
+        dir_cache = {}
+        file_cache = {}
+        # Min-heap of the 10 files with the most lines seen so far; the negated walk
+        # index makes earlier files win ties, as a stable sort would
+        largest = []
+        
         # Walk through all files in the project
-        all_files = []
-        for file_path in self.project_path.rglob("*"):
-            if file_path.is_file() and not any(part.startswith('.') for part in file_path.parts):
-                all_files.append(file_path)
+        walk_time = time.time_ns()
+        trusted_before = self._walk_time_ns - _RACY_MARGIN_NS
         
-        for file_path in all_files:
+        for index, path in enumerate(self._iter_files(dir_cache, trusted_before)):
             stats["total_files"] += 1
             
             # Count file types
-            ext = file_path.suffix.lower()
+            ext = os.path.splitext(path)[1].lower()
             if ext in stats["file_types"]:
                 stats["file_types"][ext] += 1
             else:
                 stats["file_types"][ext] = 1
             
-            # Count lines if it's a text file
+            # Binary files are counted by type only
+            if ext in BINARY_EXTS:
+                continue
+            
             try:
-                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = sum(1 for _ in f)
-                    stats["total_lines"] += lines
-                    # Track largest files
-                    stats["largest_files"].append({
-                        "path": str(file_path.relative_to(self.project_path)),
-                        "lines": lines
-                    })
-            except:
-                # Skip binary files or files that can't be read
-                pass
-        
-        # Sort largest files and keep top 10
-        stats["largest_files"].sort(key=lambda x: x["lines"], reverse=True)
-        stats["largest_files"] = stats["largest_files"][:10]
+                st = os.stat(path)
+                cached = self._file_cache.get(path)
+                if cached and cached[:2] == (st.st_size, st.st_mtime_ns) and st.st_mtime_ns < trusted_before:
+                    size, lines = cached[2]
+                # Count lines, skipping the open for empty files
+                elif st.st_size:
+                    size, lines = _count_lines(path, sniff=ext not in TEXT_EXTS)
+                else:
+                    size, lines = 0, 0
+            except OSError:
+                # Skip files that can't be read
+                continue
+            
+            file_cache[path] = (st.st_size, st.st_mtime_ns, (size, lines))
+            if lines is None:
+                continue
+            
+            stats["total_lines"] += lines
+            # Track largest files
+            item = (lines, -index, path, size)
+            if len(largest) < 10:
+                heapq.heappush(largest, item)
+            elif item > largest[0]:
+                heapq.heapreplace(largest, item)
+        
+        self._dir_cache = dir_cache
+        self._file_cache = file_cache
+        self._walk_time_ns = walk_time
+        
+        stats["largest_files"] = [
+            {
+                "path": os.path.relpath(path, self.project_path),
+                "lines": lines,
+                "size": size
+            }
+            for lines, _, path, size in sorted(largest, reverse=True)
+        ]
         
         return stats
 
@@ -340,9 +893,20 @@ class SystemMonitoringTool:
     """
     
     def __init__(self):
-        self.system_monitor = SystemMonitor()
+        self._system_monitor = None
+        # Workflow monitors by resolved project path, kept so their file caches persist
+        self._workflow_monitors = {}
     
-    def run_system_monitor(self, duration: int = 60, interval: int = 5, output_file: str = None) -> List[Dict[str, Any]]:
+    @property
+    def system_monitor(self) -> SystemMonitor:
+        """
+        System monitor, created on first use so workflow-only runs never load psutil.
+        """
+        if self._system_monitor is None:
+            self._system_monitor = SystemMonitor()
+        return self._system_monitor
+    
+    def run_system_monitor(self, duration: int = 60, interval: int = 5, output_file: str = None) -> Deque[Dict[str, Any]]:
         """
         Run system monitoring for specified duration.
         
@@ -352,13 +916,16 @@ class SystemMonitoringTool:
             output_file: Optional file to save results
             
         Returns:
-            List of system information snapshots
+            System information snapshots kept in memory (see SystemMonitor.monitor_system)
         """
+        if output_file and Path(output_file).suffix.lower() not in SnapshotWriter.FORMATS:
+            print("Error: Output file must have a .csv or .json extension")
+            return deque()
+        
         print(f"Starting system monitoring for {duration} seconds (interval: {interval}s)...")
-        data = self.system_monitor.monitor_system(duration, interval)
+        data = self.system_monitor.monitor_system(duration, interval, output_file=output_file)
         
         if output_file:
-            self.system_monitor.save_monitoring_data(output_file)
             print(f"Monitoring data saved to {output_file}")
         
         return data
@@ -376,14 +943,17 @@ class SystemMonitoringTool:
         """
         processes = self.system_monitor.get_top_processes(count, resource)
         
-        print(f"Top {count} processes by {resource.upper()} usage:")
-        print("-" * 80)
-        print(f"{'PID':<8} {'Name':<25} {'User':<15} {resource.upper():<8} Mem%")
-        print("-" * 80)
+        # Built up and written once rather than printed line by line
+        lines = []
+        lines.append(f"Top {count} processes by {resource.upper()} usage:")
+        lines.append("-" * 80)
+        lines.append(f"{'PID':<8} {'Name':<25} {'User':<15} {resource.upper():<8} Mem%")
+        lines.append("-" * 80)
         
         for proc in processes:
-            print(f"{proc['pid']:<8} {proc['name'][:24]:<25} {proc['username'] or 'N/A':<15} {proc[f'{resource}_percent']:<8.1f} {proc['memory_percent']:<5.1f}")
+            lines.append(f"{proc['pid']:<8} {proc['name'][:24]:<25} {proc['username'] or 'N/A':<15} {proc[f'{resource}_percent']:<8.1f} {proc['memory_percent']:<5.1f}")
         
+        sys.stdout.write('\n'.join(lines) + '\n')
         return processes
     
     def analyze_log_file(self, log_path: str, pattern: str = None) -> Dict[str, Any]:
@@ -403,21 +973,23 @@ class SystemMonitoringTool:
             print(f"Error: {results['error']}")
             return results
         
-        print(f"Log Analysis for: {results['file']}")
-        print(f"Total lines: {results['total_lines']}")
-        print(f"Error lines: {results['error_lines']}")
-        print(f"Error rate: {results['error_lines']/results['total_lines']*100:.2f}%")
+        lines = []
+        lines.append(f"Log Analysis for: {results['file']}")
+        lines.append(f"Total lines: {results['total_lines']}")
+        lines.append(f"Error lines: {results['error_lines']}")
+        lines.append(f"Error rate: {results['error_lines']/results['total_lines']*100:.2f}%")
         
         if results['error_patterns_found']:
-            print("\nError patterns found:")
+            lines.append("\nError patterns found:")
             for pattern, count in results['error_patterns_found'].items():
-                print(f"  {pattern}: {count} occurrences")
+                lines.append(f"  {pattern}: {count} occurrences")
         
         if results['errors']:
-            print(f"\nFirst few errors:")
+            lines.append(f"\nFirst few errors:")
             for error in results['errors'][:5]:  # Show first 5 errors
-                print(f"  Line {error['line_number']}: {error['line']}")
+                lines.append(f"  Line {error['line_number']}: {error['line']}")
         
+        sys.stdout.write('\n'.join(lines) + '\n')
         return results
     
     def monitor_workflow(self, project_path: str = ".") -> Dict[str, Any]:
@@ -430,7 +1002,11 @@ class SystemMonitoringTool:
         Returns:
             Dictionary containing workflow information
         """
-        workflow_monitor = WorkflowMonitor(project_path)
+        resolved_path = Path(project_path).resolve()
+        workflow_monitor = self._workflow_monitors.get(resolved_path)
+        if workflow_monitor is None:
+            workflow_monitor = WorkflowMonitor(project_path)
+            self._workflow_monitors[resolved_path] = workflow_monitor
         
         # Get Git status if available
         git_status = workflow_monitor.get_git_status()
@@ -444,26 +1020,28 @@ class SystemMonitoringTool:
             "timestamp": datetime.now().isoformat()
         }
         
-        print(f"Workflow monitoring for: {project_path}")
-        print("=" * 50)
+        lines = []
+        lines.append(f"Workflow monitoring for: {project_path}")
+        lines.append("=" * 50)
         
         if "error" not in git_status:
-            print(f"Git branch: {git_status['branch']}")
-            print(f"Has uncommitted changes: {git_status['has_changes']}")
-            print(f"Last commit: {git_status['last_commit']}")
+            lines.append(f"Git branch: {git_status['branch']}")
+            lines.append(f"Has uncommitted changes: {git_status['has_changes']}")
+            lines.append(f"Last commit: {git_status['last_commit']}")
         
-        print(f"\nProject stats:")
-        print(f"  Total files: {project_stats['total_files']}")
-        print(f"  Total lines: {project_stats['total_lines']}")
+        lines.append(f"\nProject stats:")
+        lines.append(f"  Total files: {project_stats['total_files']}")
+        lines.append(f"  Total lines: {project_stats['total_lines']}")
         
-        print(f"\nFile types:")
+        lines.append(f"\nFile types:")
         for ext, count in sorted(project_stats['file_types'].items(), key=lambda x: x[1], reverse=True)[:10]:
-            print(f"  {ext or 'no extension'}: {count}")
+            lines.append(f"  {ext or 'no extension'}: {count}")
         
-        print(f"\nLargest files:")
+        lines.append(f"\nLargest files:")
         for file_info in project_stats['largest_files'][:5]:
-            print(f"  {file_info['path']}: {file_info['lines']} lines")
+            lines.append(f"  {file_info['path']}: {file_info['lines']} lines")
         
+        sys.stdout.write('\n'.join(lines) + '\n')
         return results
 
 
@@ -471,6 +1049,8 @@ def main():
     """
     Main function to demonstrate the SystemMonitoringTool capabilities.
     """
+    import argparse
+    
     parser = argparse.ArgumentParser(description='System Monitoring Tool')
     parser.add_argument('command', choices=['system', 'processes', 'log', 'workflow'], 
                        help='Command to execute')
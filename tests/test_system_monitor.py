@@ -0,0 +1,489 @@
+"""
+Unit tests for the system monitor module.
+"""
+
+import io
+import json
+import os
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to the Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import system_monitor
+from system_monitor import CSV_FIELDS, SnapshotWriter, SystemMonitor, SystemMonitoringTool, WorkflowMonitor, _required_literal
+
+
+DEFAULT_PATTERNS = ['error', 'exception', 'fail', 'traceback', 'critical', 'fatal']
+
+
+class RequiredLiteralTest(unittest.TestCase):
+    """
+    Tests for extracting the literal pre-filter from a user log pattern.
+    """
+
+    def test_plain_pattern(self):
+        self.assertEqual(_required_literal('Timeout'), b'timeout')
+
+    def test_optional_char_splits_literal(self):
+        self.assertEqual(_required_literal('time?out'), b'tim')
+
+    def test_groups_and_classes_are_not_literal(self):
+        self.assertEqual(_required_literal('x(abc)?yz'), b'yz')
+        self.assertEqual(_required_literal('[]abc]xyz'), b'xyz')
+
+    def test_no_literal(self):
+        self.assertIsNone(_required_literal('abc|def'))
+        self.assertIsNone(_required_literal('(?x)foo bar'))
+        self.assertIsNone(_required_literal(r'\d+'))
+
+    def test_numeric_escapes_are_skipped_whole(self):
+        self.assertEqual(_required_literal(r'\x41BC'), b'bc')
+        self.assertEqual(_required_literal(r'\U00000041BC'), b'bc')
+        self.assertEqual(_required_literal(r'\101bc'), b'bc')
+        self.assertEqual(_required_literal(r'\N{LATIN CAPITAL LETTER A}BC'), b'bc')
+        self.assertEqual(_required_literal(r'(a)\1bc'), b'bc')
+
+    def test_literal_is_contained_in_every_match(self):
+        # The literal must never reject a line the pattern itself matches
+        cases = [
+            (r'\x41BC', 'hello ABC world'),
+            (r'\101bc', 'Abc'),
+            (r'err\.code', 'ERR.CODE 5'),
+            (r'\d+ failed', '3 failed'),
+        ]
+        for pattern, line in cases:
+            literal = _required_literal(pattern)
+            self.assertIn(literal, line.lower().encode(), pattern)
+
+
+class AnalyzeLogsTest(unittest.TestCase):
+    """
+    Tests for SystemMonitor.analyze_logs.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monitor = SystemMonitor()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_log(self, data: bytes) -> str:
+        path = Path(self.tmpdir.name) / 'app.log'
+        path.write_bytes(data)
+        return str(path)
+
+    def found(self, results):
+        return [(e['line_number'], e['pattern']) for e in results['errors']]
+
+    def test_trailing_line_without_newline(self):
+        results = self.monitor.analyze_logs(self.write_log(b'ok\nstill ok\nfatal: disk full'))
+        self.assertEqual(results['total_lines'], 3)
+        self.assertEqual(self.found(results), [(3, 'fatal')])
+        self.assertEqual(results['errors'][0]['line'], 'fatal: disk full')
+
+    def test_empty_file(self):
+        results = self.monitor.analyze_logs(self.write_log(b''))
+        self.assertEqual(results['total_lines'], 0)
+        self.assertEqual(results['errors'], [])
+
+    def test_line_spanning_chunk_boundary(self):
+        data = b'first line\nsome long Exception message\nlast\n'
+        # Every chunk size splits the middle line somewhere, including inside the keyword
+        for chunk_size in range(1, len(data) + 1):
+            with mock.patch.object(system_monitor, '_LOG_CHUNK_SIZE', chunk_size):
+                results = self.monitor.analyze_logs(self.write_log(data))
+            self.assertEqual(results['total_lines'], 3, chunk_size)
+            self.assertEqual(self.found(results), [(2, 'exception')], chunk_size)
+            self.assertEqual(results['errors'][0]['line'], 'some long Exception message')
+
+    def test_line_numbers(self):
+        data = b'ok\nerror one\n\nok\nFAIL two\nok\ncritical and fatal\n'
+        results = self.monitor.analyze_logs(self.write_log(data))
+        self.assertEqual(results['total_lines'], 7)
+        self.assertEqual(results['error_lines'], 3)
+        self.assertEqual(self.found(results), [(2, 'error'), (5, 'fail'), (7, 'critical'), (7, 'fatal')])
+
+    def test_matches_line_by_line_reference(self):
+        words = ['ok', 'error', 'Fail', 'x', 'TRACEBACK', 'foo', 'timeout', '\u00e9', '']
+        rng = random.Random(0)
+        for _ in range(100):
+            lines = [' '.join(rng.choice(words) for _ in range(rng.randint(0, 4))) for _ in range(rng.randint(0, 20))]
+            text = '\n'.join(lines) + rng.choice(['', '\n'])
+            path = self.write_log(text.encode())
+            lines = text.split('\n')
+            if lines[-1] == '':
+                lines.pop()
+
+            for pattern in [None, 'time?out', 'fo+', 'x|ok']:
+                expected = []
+                for line_num, line in enumerate(lines, 1):
+                    # Default patterns in order of first occurrence on the line
+                    hits = [(re.search(p, line, re.IGNORECASE), p) for p in DEFAULT_PATTERNS]
+                    names = dict.fromkeys(p for _, p in sorted((m.start(), p) for m, p in hits if m))
+                    if pattern and re.search(pattern, line, re.IGNORECASE):
+                        names[pattern] = None
+                    expected.extend((line_num, name) for name in names)
+
+                with mock.patch.object(system_monitor, '_LOG_CHUNK_SIZE', rng.randint(1, 16)):
+                    results = self.monitor.analyze_logs(path, pattern)
+                self.assertEqual(results['total_lines'], len(lines))
+                self.assertEqual(self.found(results), expected)
+
+    def test_max_errors_caps_stored_matches_only(self):
+        data = b''.join(b'error %d\n' % i for i in range(50))
+        results = self.monitor.analyze_logs(self.write_log(data), max_errors=10)
+        self.assertEqual(len(results['errors']), 10)
+        self.assertEqual(results['errors'][-1]['line_number'], 10)
+        # Counts still cover the whole file
+        self.assertEqual(results['error_lines'], 50)
+        self.assertEqual(results['error_patterns_found'], {'error': 50})
+
+    def test_escaped_user_pattern_matches(self):
+        results = self.monitor.analyze_logs(self.write_log(b'ok\nhello ABC world\n'), r'\x41BC')
+        self.assertEqual(results['error_lines'], 1)
+        self.assertEqual(results['errors'][0]['line_number'], 2)
+
+    def test_crlf_line_endings(self):
+        results = self.monitor.analyze_logs(self.write_log(b'job started\r\njob done\r\n'), 'done$')
+        self.assertEqual(results['total_lines'], 2)
+        self.assertEqual(results['error_lines'], 1)
+        self.assertEqual(results['errors'][0]['line'], 'job done')
+
+    def test_non_ascii_case_folding(self):
+        # str regexes with IGNORECASE match these; the byte pre-filter must not drop them
+        data = 'FA\u0130L one\nTRACEBAC\u212a two\nmi\u017fsing\n'.encode()
+        results = self.monitor.analyze_logs(self.write_log(data), 'missing')
+        self.assertEqual(
+            [(e['line_number'], e['pattern']) for e in results['errors']],
+            [(1, 'fail'), (2, 'traceback'), (3, 'missing')]
+        )
+
+
+class MonitorSystemTest(unittest.TestCase):
+    """
+    Tests for SystemMonitor.monitor_system.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.monitor = SystemMonitor()
+        self.snapshots = 0
+
+        def fake_system_info():
+            self.snapshots += 1
+            return dict.fromkeys(CSV_FIELDS, self.snapshots)
+
+        self.monitor.get_system_info = fake_system_info
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_streaming_bounds_memory(self):
+        output = Path(self.tmpdir.name) / 'out.csv'
+        with mock.patch.object(system_monitor, 'STREAMED_HISTORY', 3):
+            data = self.monitor.monitor_system(duration=0.05, interval=0, output_file=str(output))
+
+        self.assertGreater(self.snapshots, 3)
+        self.assertEqual([row['timestamp'] for row in data], [self.snapshots - 2, self.snapshots - 1, self.snapshots])
+        # Header plus every snapshot, not just the ones kept in memory
+        self.assertEqual(len(output.read_text().splitlines()), self.snapshots + 1)
+
+    def test_keeps_all_snapshots_without_output(self):
+        data = self.monitor.monitor_system(duration=0.05, interval=0)
+        self.assertEqual(len(data), self.snapshots)
+
+    def test_first_snapshot_waits_one_interval_after_priming(self):
+        events = []
+        fake_system_info = self.monitor.get_system_info
+
+        def recording_system_info():
+            events.append(('sample', time.monotonic()))
+            return fake_system_info()
+
+        def recording_cpu_percent(interval=None):
+            events.append(('prime', time.monotonic()))
+
+        self.monitor.get_system_info = recording_system_info
+        with mock.patch('psutil.cpu_percent', side_effect=recording_cpu_percent):
+            self.monitor.monitor_system(duration=0.3, interval=0.1)
+
+        self.assertEqual(events[0][0], 'prime')
+        self.assertEqual([name for name, _ in events[1:]], ['sample'] * self.snapshots)
+        self.assertGreaterEqual(events[1][1] - events[0][1], 0.1)
+
+    def test_overrun_skips_missed_ticks(self):
+        times = []
+        fake_system_info = self.monitor.get_system_info
+
+        def stalling_system_info():
+            times.append(time.monotonic())
+            if len(times) == 1:
+                # Overrun three ticks on the first sample
+                time.sleep(0.35)
+            return fake_system_info()
+
+        self.monitor.get_system_info = stalling_system_info
+        self.monitor.monitor_system(duration=0.8, interval=0.1)
+
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        self.assertGreaterEqual(min(gaps[1:]), 0.09)
+
+    def test_unsupported_output_extension_is_reported(self):
+        output = Path(self.tmpdir.name) / 'out.txt'
+        tool = SystemMonitoringTool()
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            data = tool.run_system_monitor(duration=1, interval=1, output_file=str(output))
+
+        self.assertEqual(len(data), 0)
+        self.assertIn('Error:', stdout.getvalue())
+        self.assertFalse(output.exists())
+
+
+class JsonOutputTest(unittest.TestCase):
+    """
+    Tests for the JSON snapshot output.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_stdlib_fallback_matches_orjson(self):
+        data = {'timestamp': '2024-01-01 00:00:00', 'cpu': {'percent': 12.5, 'count': 4}, 'name': 'café', 'pids': [1, 2]}
+        with mock.patch.object(system_monitor, '_json_encoder', None):
+            expected = [system_monitor._to_json(data), system_monitor._to_json(data, indent=True)]
+        with mock.patch.object(system_monitor, '_json_encoder', None), mock.patch.dict(sys.modules, {'orjson': None}):
+            actual = [system_monitor._to_json(data), system_monitor._to_json(data, indent=True)]
+
+        self.assertEqual(actual, expected)
+
+    def test_system_info_keys_match_csv_fields(self):
+        self.assertEqual(tuple(SystemMonitor().get_system_info()), CSV_FIELDS)
+
+    def test_nest_snapshot_restores_nested_layout(self):
+        row = {field: index for index, field in enumerate(CSV_FIELDS)}
+        nested = system_monitor._nest_snapshot(row)
+
+        self.assertEqual(nested, {
+            'timestamp': 0,
+            'cpu_percent': 1,
+            'cpu_count': 2,
+            'memory': {'total': 3, 'available': 4, 'percent': 5, 'used': 6},
+            'disk': {'total': 7, 'used': 8, 'free': 9, 'percent': 10},
+            'network': {'bytes_sent': 11, 'bytes_recv': 12},
+        })
+        flattened = {}
+        for key, value in nested.items():
+            if isinstance(value, dict):
+                flattened.update((f'{key}_{field}', inner) for field, inner in value.items())
+            else:
+                flattened[key] = value
+        self.assertEqual(flattened, row)
+
+    def test_streamed_file_is_valid_json(self):
+        output = Path(self.tmpdir.name) / 'out.json'
+        rows = [dict.fromkeys(CSV_FIELDS, n) for n in range(3)]
+        writer = SnapshotWriter(str(output))
+        for row in rows:
+            writer.write(row)
+        writer.close()
+
+        with open(output) as f:
+            self.assertEqual(json.load(f), [system_monitor._nest_snapshot(row) for row in rows])
+
+    def test_streamed_file_without_snapshots_is_valid_json(self):
+        output = Path(self.tmpdir.name) / 'out.json'
+        SnapshotWriter(str(output)).close()
+
+        self.assertEqual(output.read_text(), '[\n]\n')
+        with open(output) as f:
+            self.assertEqual(json.load(f), [])
+
+
+class GitStatusTest(unittest.TestCase):
+    """
+    Tests for WorkflowMonitor.get_git_status against a real temporary repository.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        self.git('init', '-q', '-b', 'main')
+        (self.root / 'a.txt').write_text('one\n')
+        self.git('add', 'a.txt')
+        self.git('commit', '-q', '-m', 'Initial commit')
+        self.monitor = WorkflowMonitor(str(self.root))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def git(self, *args):
+        subprocess.run(
+            ['git', '-c', 'user.name=Test', '-c', 'user.email=test@example.com', *args],
+            cwd=self.root, check=True, capture_output=True
+        )
+
+    def test_clean(self):
+        status = self.monitor.get_git_status()
+        self.assertEqual(status['branch'], 'main')
+        self.assertFalse(status['has_changes'])
+        self.assertIn('Initial commit', status['last_commit'])
+
+    def test_modified_file_is_a_change(self):
+        (self.root / 'a.txt').write_text('two\n')
+        status = self.monitor.get_git_status()
+        self.assertEqual(status['branch'], 'main')
+        self.assertTrue(status['has_changes'])
+
+    def test_untracked_file_is_a_change(self):
+        (self.root / 'b.txt').write_text('new\n')
+        self.assertTrue(self.monitor.get_git_status()['has_changes'])
+
+    def test_detached_head(self):
+        self.git('checkout', '-q', '--detach')
+        status = self.monitor.get_git_status()
+        self.assertEqual(status['branch'], '(detached)')
+        self.assertFalse(status['has_changes'])
+
+
+class ProjectStatsTest(unittest.TestCase):
+    """
+    Tests for WorkflowMonitor.get_project_stats on a single walk.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        # Newlines in the binary files would dominate the counts if they were read
+        (self.root / 'image.png').write_bytes(b'\n' * 50)
+        (self.root / 'blob.dat').write_bytes(b'\0' + b'\n' * 40)
+        (self.root / 'notes.cfg').write_text('a\nb\n')
+        (self.root / 'main.py').write_text('x\n' * 5)
+        (self.root / 'src').mkdir()
+        for i in range(12):
+            (self.root / 'src' / f'f{i:02}.txt').write_text('line\n' * 2 + 'x' * (i + 1) + '\n')
+        self.monitor = WorkflowMonitor(str(self.root))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_binary_files_are_typed_but_not_counted(self):
+        stats = self.monitor.get_project_stats()
+
+        self.assertEqual(stats['total_files'], 16)
+        self.assertEqual(stats['file_types'], {'.png': 1, '.dat': 1, '.cfg': 1, '.py': 1, '.txt': 12})
+        # notes.cfg has an unknown extension but no NUL, so its lines count
+        self.assertEqual(stats['total_lines'], 2 + 5 + 12 * 3)
+        paths = [entry['path'] for entry in stats['largest_files']]
+        self.assertNotIn('image.png', paths)
+        self.assertNotIn('blob.dat', paths)
+
+    def test_largest_files_keeps_top_ten_with_ties_in_walk_order(self):
+        walk_order = [
+            os.path.relpath(path, self.root)
+            for path in self.monitor._iter_files({}, 0)
+            if path.endswith('.txt')
+        ]
+        stats = self.monitor.get_project_stats()
+
+        self.assertEqual(len(stats['largest_files']), 10)
+        self.assertEqual(stats['largest_files'][0]['path'], 'main.py')
+        # Twelve files tie on three lines; the first nine walked fill the remaining slots
+        self.assertEqual([entry['path'] for entry in stats['largest_files'][1:]], walk_order[:9])
+        for entry in stats['largest_files']:
+            self.assertEqual(entry['size'], os.path.getsize(self.root / entry['path']))
+
+
+class ProjectStatsCacheTest(unittest.TestCase):
+    """
+    Tests that repeated WorkflowMonitor.get_project_stats calls see every change.
+
+    Each change is made right after the previous walk and the touched entries'
+    mtimes are then reset, as happens when the change lands in the same coarse
+    filesystem timestamp tick as the walk.
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmpdir.name)
+        (self.root / 'pkg').mkdir()
+        (self.root / 'pkg' / 'a.py').write_text('1\n2\n')
+        (self.root / 'b.txt').write_text('x\n')
+        self.monitor = WorkflowMonitor(str(self.root))
+        self.monitor.get_project_stats()
+        self.mtimes = {
+            path: path.stat().st_mtime_ns
+            for path in [self.root, self.root / 'pkg', self.root / 'pkg' / 'a.py', self.root / 'b.txt']
+        }
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def same_tick(self, *paths):
+        for path in paths:
+            os.utime(path, ns=(self.mtimes[path], self.mtimes[path]))
+
+    def assertMatchesFreshWalk(self, stats):
+        self.assertEqual(stats, WorkflowMonitor(str(self.root)).get_project_stats())
+
+    def test_added_file(self):
+        (self.root / 'pkg' / 'c.py').write_text('1\n')
+        self.same_tick(self.root / 'pkg')
+        stats = self.monitor.get_project_stats()
+        self.assertEqual(stats['total_files'], 3)
+        self.assertEqual(stats['total_lines'], 4)
+        self.assertMatchesFreshWalk(stats)
+
+    def test_deleted_file(self):
+        (self.root / 'b.txt').unlink()
+        self.same_tick(self.root)
+        stats = self.monitor.get_project_stats()
+        self.assertEqual(stats['total_files'], 1)
+        self.assertEqual(stats['total_lines'], 2)
+        self.assertMatchesFreshWalk(stats)
+
+    def test_edited_file_same_size(self):
+        (self.root / 'pkg' / 'a.py').write_text('1\n\n\n')
+        (self.root / 'b.txt').write_text('x\ny')
+        self.same_tick(self.root / 'pkg' / 'a.py', self.root / 'b.txt')
+        stats = self.monitor.get_project_stats()
+        self.assertEqual(stats['total_lines'], 5)
+        self.assertMatchesFreshWalk(stats)
+
+    def test_new_subdirectory(self):
+        (self.root / 'pkg' / 'sub').mkdir()
+        (self.root / 'pkg' / 'sub' / 'd.md').write_text('a\nb\nc\n')
+        self.same_tick(self.root / 'pkg')
+        stats = self.monitor.get_project_stats()
+        self.assertEqual(stats['total_files'], 3)
+        self.assertEqual(stats['file_types']['.md'], 1)
+        self.assertMatchesFreshWalk(stats)
+
+    def test_old_entries_are_reused(self):
+        # Age every entry well past the racy window, then walk once to cache them
+        for path in [self.root / 'pkg' / 'a.py', self.root / 'b.txt', self.root / 'pkg', self.root]:
+            os.utime(path, ns=(10**18, 10**18))
+        self.monitor.get_project_stats()
+        stats = self.monitor.get_project_stats()
+
+        with mock.patch.object(system_monitor, '_count_lines') as count_lines, \
+                mock.patch.object(system_monitor.os, 'scandir') as scandir:
+            self.assertEqual(self.monitor.get_project_stats(), stats)
+        count_lines.assert_not_called()
+        scandir.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()